@@ -66,112 +66,206 @@ Examples:
 
 """
 import argparse
+import atexit
+import concurrent.futures
+import functools
 import os
+import pathlib
 import re
 import sys
 import time
+import typing
+
+# The separator line printed between sections of the output.
+SEPARATOR: str = "-" * 120
+
+# The suffixes of string files and their backups.
+STRING_FILE_SUFFIX: str = ".str"
+BACKUP_SUFFIX: str = ".bak"
+BACKUP_FILE_SUFFIX: str = STRING_FILE_SUFFIX + BACKUP_SUFFIX
+
+# Matches a unicode escape sequence as written by `EncodeStringFiles`, e.g., "\u00e4".
+UNICODE_ESCAPE_PATTERN: re.Pattern = re.compile(r"\\u([0-9a-fA-F]{4})")
+
+def IterFiles(path: str, suffix: str) -> typing.Iterator[str]:
+    """Yields the paths of all files in #path and its subdirectories which end in #suffix.
+
+    Uses `os.scandir` instead of `os.walk`, so that the file type information cached in the
+    directory entries can be used without issuing an extra stat call for each entry.
+
+    Args:
+        path (str): The path to the directory to walk.
+        suffix (str): The suffix a file name must end in to be yielded, e.g., ".str".
+    """
+    # Read the directory in one go, as the callers of this function create and delete files in it.
+    with os.scandir(path) as it:
+        entries: list[os.DirEntry] = list(it)
+
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            yield from IterFiles(entry.path, suffix)
+        elif entry.name.endswith(suffix):
+            yield entry.path
+
+def ProcessFiles(path: str, suffix: str, worker: typing.Callable[[str], list[str]]) -> None:
+    """Runs #worker in parallel over all cores for each file in #path which ends in #suffix.
+
+    Args:
+        path (str): The path to the directory containing the files to process.
+        suffix (str): The suffix a file name must end in to be processed, e.g., ".str".
+        worker (typing.Callable[[str], list[str]]): The function to process a single file with. It
+            is called with the path of the file and returns the messages to print. It must be
+            picklable, i.e., a module level function or a partial of one.
+    """
+    paths: list[str] = list(IterFiles(path, suffix))
+    with concurrent.futures.ProcessPoolExecutor() as executor:
+        for messages in executor.map(worker, paths, chunksize=32):
+            for message in messages:
+                print(message)
+
+def EncodeStringFile(fPath: str, createBackups: bool = True,
+                     verboseOutput: bool = True) -> list[str]:
+    """Escapes all unicode characters in the string file #fPath to their escape sequences in ASCII.
+
+    Args:
+        fPath (str): The path of the file to encode.
+        createBackups (bool): If True, creates a backup of the file before encoding it. A file is
+            only backed up once, I.e., existing backups will not be overwritten.
+        verboseOutput (bool): If True, the original and escaped content are reported too.
+
+    Returns:
+        list[str]: The messages for the caller to print. This function is run in worker processes
+            by `EncodeStringFiles`, so it must not print itself.
+    """
+    messages: list[str] = []
+
+    # Read the raw bytes, so that we can test for pure ASCII files without decoding them first. The
+    # file is opened unbuffered, so that it is read with a single call sized to its length.
+    raw: bytes = b""
+    with open(fPath, "rb", buffering=0) as f:
+        raw = f.read()
+
+    if not raw:
+        messages.append(f"Warning: The file {fPath} is empty or could not be read.")
+        return messages
+
+    # Most string files are pure ASCII, there is nothing to escape in them.
+    if raw.isascii():
+        return messages
+
+    # The content is decoded from the raw bytes, i.e., it keeps its original line endings.
+    content: str = raw.decode("utf-8")
+
+    # Python's `string.encode("unicode_escape")` will yield hexadecimal escape sequences
+    # (e.g. "\xXX"), but our C++ API expects unicode escape sequences (e.g. "\uXXXX"). I do 
+    # not see a way how Python can do this out of the box, so we build a translation table
+    # for the non-ASCII characters which actually occur in the file and let `str.translate`
+    # escape all of them in one pass, e.g. "ä" becomes "\u00e4".
+    table: dict[int, str] = {
+        cp: "\\u%04x" % cp for cp in set(map(ord, content)) if cp > 0x7f}
+    newContent: str = content.translate(table)
+    if newContent == content:
+        return messages
+
+    # Write the escaped content only once into a temporary file and then move it over the original
+    # file. A backup does not require writing the content again, we can just rename the original.
+    tmpPath: str = fPath + ".tmp"
+    pathlib.Path(tmpPath).write_bytes(newContent.encode("ascii"))
+
+    # The permissions must be set on the temporary file, as it is the file which will end up at
+    # #fPath, while the original file becomes the backup.
+    try:
+        os.chmod(tmpPath, 0o600)  # Read/write for user only
+    except Exception as e:
+        messages.append(f"Error setting permissions for {fPath}: {e}")
+
+    bakPath: str = fPath + BACKUP_SUFFIX
+    if createBackups and not os.path.exists(bakPath):
+        try:
+            os.rename(fPath, bakPath)
+            messages.append(f"Created backup for {fPath} at {bakPath}.")
+        except Exception as e:
+            messages.append(f"Error creating backup for {fPath}: {e}")
+
+    os.replace(tmpPath, fPath)
+
+    if verboseOutput:
+        messages.append(f"Encoded {fPath} to ASCII.\n{SEPARATOR}\nOriginal content:\n{content}\n"
+                        f"Escaped content:\n{newContent}")
+    else:
+        messages.append(f"Encoded {fPath} to ASCII.")
+
+    return messages
 
 def EncodeStringFiles(path: str, createBackups: bool = True, verboseOutput: bool = True) -> None:
     """Escapes all unicode characters in string files in #path to their escape sequences in ASCII.
 
+    The files are independent of each other, so they are encoded in parallel over all cores.
+    Encoding is idempotent: an already encoded file is pure ASCII and is skipped after its raw
+    bytes have been read, i.e., running the encoding again on a tree does not write any files.
+
     Args:
         path (str): The path to the directory containing the files to encode.
         createBackups (bool): If True, creates a backup of each file before encoding. A file is
             only backed up once, I.e., existing backups will not be overwritten.
     """
-    # Walk through the directory and its subdirectories.
-    for root, _, files in os.walk(path):
-        for filename in files:
-            # Only process files with the .str extension.
-            if not filename.endswith(".str"):
-                continue
-
-            fPath: str = os.path.join(root, filename)
-            try:
-                os.chmod(fPath, 0o600)  # Read/write for user only
-            except Exception as e:
-                print(f"Error setting permissions for {fPath}: {e}")
-
-            content: str = ""
-            with open(fPath, "r", encoding="utf-8") as f:
-                content = f.read()
-
-            if not content:
-                print(f"Warning: The file {fPath} is empty or could not be read.")
-                continue
-
-            # Python's `string.encode("unicode_escape")` will yield hexadecimal escape sequences
-            # (e.g. "\xXX"), but our C++ API expects unicode escape sequences (e.g. "\uXXXX"). I do 
-            # not see a way how Python can do this out of the box, so we use this little function.
-            def EscapeUnicode(item: str) -> str:
-                return re.sub(r"([^\x00-\x7f])",
-                              lambda m: "\\u{:04x}".format(ord(m.group(1))), item
-                )
-            
-            # Escape all unicode characters in the content, e.g. "ä" becomes "\u00e4".
-            newContent: str = EscapeUnicode(content)
-            if newContent == content:
-                continue
+    ProcessFiles(path, STRING_FILE_SUFFIX, functools.partial(
+        EncodeStringFile, createBackups=createBackups, verboseOutput=verboseOutput))
 
-            bakPath: str = fPath + ".bak"
-            if createBackups and not os.path.exists(bakPath):
-                try:
-                    with open(bakPath, "w", encoding="utf-8") as f:
-                        f.write(content)
-                    print(f"Created backup for {fPath} at {bakPath}.")
-                except Exception as e:
-                    print(f"Error creating backup for {fPath}: {e}")
-            
-            with open(fPath, "w", encoding="ascii") as f:
-                f.write(newContent)
-
-            if verboseOutput:
-                print(f"Encoded {fPath} to ASCII.")
-                print("-" * 120)
-                print("\nOriginal content:\n")
-                print(content)
-                print("\nEscaped content:\n")
-                print(newContent)
-            else:
-                print(f"Encoded {fPath} to ASCII.")
+def DecodeStringFile(fPath: str, verboseOutput: bool = True) -> list[str]:
+    """Unescapes all unicode escape sequences in the string file #fPath back to their characters.
+
+    Args:
+        fPath (str): The path of the file to decode.
+        verboseOutput (bool): If True, the original and decoded content are reported too.
+
+    Returns:
+        list[str]: The messages for the caller to print. This function is run in worker processes
+            by `DecodeStringFiles`, so it must not print itself.
+    """
+    messages: list[str] = []
+    try:
+        # Read and write the whole file in one go.
+        content: str = pathlib.Path(fPath).read_bytes().decode("utf-8")
+
+        # Only files which contain unicode escape sequences must be decoded, skip all others
+        # without running them through the codec machinery.
+        if "\\u" not in content:
+            return messages
+
+        # Decode the escape sequences back to unicode characters. Only the unicode escape sequences
+        # are substituted, other escape sequences such as "\n" are left untouched.
+        decodedContent: str = UNICODE_ESCAPE_PATTERN.sub(
+            lambda m: chr(int(m.group(1), 16)), content)
+
+        if decodedContent == content:
+            return messages
+
+        pathlib.Path(fPath).write_bytes(decodedContent.encode("utf-8"))
+
+        if verboseOutput:
+            messages.append(f"Decoded {fPath} from ASCII.\n{SEPARATOR}\nOriginal content:\n"
+                            f"{content}\nDecoded content:\n{decodedContent}")
+        else:
+            messages.append(f"Decoded {fPath} from ASCII.")
+
+    except Exception as e:
+        messages.append(f"Error decoding {fPath}: {e}")
+
+    return messages
 
 def DecodeStringFiles(path: str, verboseOutput: bool = True) -> None:
     """Unescapes all escape sequences in string files in #path back to their unicode characters.
 
     This is the reverse operation of `EncodeStringFiles`. It will decode escape sequences like
-    "\u00e4" back to their original unicode characters like "ä".
+    "\u00e4" back to their original unicode characters like "ä". The files are decoded in parallel
+    over all cores.
 
     Args:
         path (str): The path to the directory containing the files to decode.
     """
-    for root, _, files in os.walk(path):
-        for filename in files:
-            if filename.endswith(".str"):
-                fPath: str = os.path.join(root, filename)
-                try:
-                    with open(fPath, "r", encoding="utf-8") as f:
-                        content = f.read()
-                    # Decode the escape sequences back to unicode characters.
-                    decodedContent: str = content.encode("utf-8").decode("unicode_escape")
-
-                    if decodedContent == content:
-                        continue
-
-                    with open(fPath, "w", encoding="utf-8") as f:
-                        f.write(decodedContent)
-       
-                    if verboseOutput:
-                        print(f"Decoded {fPath} from ASCII.")
-                        print("-" * 120)
-                        print("\nOriginal content:\n")
-                        print(content)
-                        print("\nDecoded content:\n")
-                        print(decodedContent)
-                    else:
-                        print(f"Decoded {fPath} from ASCII.")
-
-                except Exception as e:
-                    print(f"Error decoding {fPath}: {e}")
+    ProcessFiles(path, STRING_FILE_SUFFIX, functools.partial(
+        DecodeStringFile, verboseOutput=verboseOutput))
 
 def RestoreFilesFromBackups(path: str) -> None:
     """Restores all files from their backups in the given path.
@@ -179,20 +273,15 @@ def RestoreFilesFromBackups(path: str) -> None:
     Args:
         path (str): The path to the directory containing the files to restore.
     """
-    for root, _, files in os.walk(path):
-        for filename in files:
-            if filename.endswith(".str.bak"):
-                fPath: str = os.path.join(root, filename)
-                originalPath: str = fPath[:-4]  # Remove the ".bak" suffix
-                try:
-                    with open(fPath, "r", encoding="utf-8") as f:
-                        content = f.read()
-                    with open(originalPath, "w", encoding="utf-8") as f:
-                        f.write(content)
-                    os.remove(fPath)  # Remove the backup file after restoring
-                    print(f"Restored {originalPath} from backup.")
-                except Exception as e:
-                    print(f"Error restoring {originalPath} from backup: {e}")
+    for fPath in IterFiles(path, BACKUP_FILE_SUFFIX):
+        originalPath: str = fPath.removesuffix(BACKUP_SUFFIX)
+        try:
+            # Move the backup over the original file, the backup is removed by this too. There
+            # is no need to read and write the content of the file.
+            os.replace(fPath, originalPath)
+            print(f"Restored {originalPath} from backup.")
+        except Exception as e:
+            print(f"Error restoring {originalPath} from backup: {e}")
 
 def DeleteBackupFiles(path: str) -> None:
     """Deletes all backup files in the given path.
@@ -206,15 +295,12 @@ def DeleteBackupFiles(path: str) -> None:
         print("Operation cancelled.")
         return
     
-    for root, _, files in os.walk(path):
-        for filename in files:
-            if filename.endswith(".str.bak"):
-                fPath: str = os.path.join(root, filename)
-                try:
-                    os.remove(fPath)
-                    print(f"Deleted backup file: {fPath}")
-                except Exception as e:
-                    print(f"Error deleting {fPath}: {e}")
+    for fPath in IterFiles(path, BACKUP_FILE_SUFFIX):
+        try:
+            os.remove(fPath)
+            print(f"Deleted backup file: {fPath}")
+        except Exception as e:
+            print(f"Error deleting {fPath}: {e}")
 
 def main() -> None:
     """Runs the script.
@@ -229,6 +315,9 @@ def main() -> None:
         """Realizes a simple dual channel (stdin/stdout + file) log handler, because doing this 
         with the logging module of Python is unnecessarily complicated.
         """
+        logFile: typing.Optional[typing.TextIO] = None
+        timeStampCache: tuple[int, str] = (0, "")
+
         def __init__(self, stream: str):
             if stream == "out":
                 self.stream = sys.stdout
@@ -242,30 +331,52 @@ def main() -> None:
             name: str = os.path.splitext(os.path.basename(__file__))[0]
             self.log: str = os.path.join(os.path.dirname(__file__), f"{name}.log")
 
-            with open(self.log, "a", encoding="utf-8") as logFile:
-                if stream == "out":
-                    logFile.write("=" * 120 + "\n")
-                logFile.write(f"{time.strftime('%Y-%m-%d %H:%M:%S')} - "
-                              "Opened new '{stream}' log handler.\n")
-                if stream == "err":
-                    logFile.write("=" * 120 + "\n")
+            # Keep the log file open for the lifetime of the handlers instead of opening and closing
+            # it for each message. The buffered file is shared by all handlers, so that their
+            # messages are not reordered, and is closed when the interpreter exits.
+            if LogHandler.logFile is None:
+                LogHandler.logFile = open(self.log, "a", encoding="utf-8", buffering=8192)
+                atexit.register(LogHandler.logFile.close)
+
+            if stream == "out":
+                self.logFile.write("=" * 120 + "\n")
+            self.logFile.write(f"{self.GetTimeStamp()} - "
+                               "Opened new '{stream}' log handler.\n")
+            if stream == "err":
+                self.logFile.write("=" * 120 + "\n")
 
         def write(self, message: str) -> None:
             """Write a message to the stream and log it.
             """
-            if message.strip():
-                self.stream.write(f"{message.strip()}\n")
+            message = message.strip()
+            if message:
+                self.stream.write(f"{message}\n")
                 try:
-                    with open(self.log, "a", encoding="utf-8") as logFile:
-                        logFile.write(f"{time.strftime('%Y-%m-%d %H:%M:%S')} - {message.strip()}\n")
+                    self.logFile.write(f"{self.GetTimeStamp()} - {message}\n")
                 except Exception as e:
                     pass
 
+        def GetTimeStamp(self) -> str:
+            """Returns the formatted time stamp for the current second.
+
+            `time.strftime` is comparatively expensive, so the formatted string is cached and only
+            rebuilt once the wall-clock second has advanced.
+            """
+            now: int = int(time.time())
+            if now != LogHandler.timeStampCache[0]:
+                LogHandler.timeStampCache = (
+                    now, time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(now)))
+            return LogHandler.timeStampCache[1]
+
         def flush(self) -> None:
-            """Flush the stream.
+            """Flush the stream and the log file.
             """
             if hasattr(self.stream, 'flush'):
                 self.stream.flush()
+            try:
+                self.logFile.flush()
+            except Exception as e:
+                pass
     
     # Attach our log handler to both stdout and stderr. 
     handlers: list[LogHandler] = [
@@ -297,7 +408,7 @@ def main() -> None:
         mode = args.mode
         verboseMode = args.verbose
         print(f"Running with arguments: {args}")
-        print("-" * 120)
+        print(SEPARATOR)
 
     # Query the user instead.
     else:
@@ -330,19 +441,14 @@ def main() -> None:
         if mode not in ("e", "d", "r", "c"):
             raise ValueError("Invalid mode. Please enter 'e', 'd', 'r', or 'c'.")
     
-    # Sort out all the path issues.
-    if not isinstance(resPath, str):
-        raise ValueError("The path must be a valid string.")
+    # Sort out all the path issues. Relative paths are relative to the script and not the working
+    # directory, they are resolved without changing the process-wide working directory.
     if not os.path.isabs(resPath):
-        cwd = os.getcwd()
-        os.chdir(os.path.dirname(__file__))
-        resPath = os.path.abspath(resPath)
-        os.chdir(cwd)
+        resPath = os.path.abspath(
+            os.path.join(os.path.dirname(os.path.abspath(__file__)), resPath))
         print(f"Using absolute path: {resPath}")
-    if not os.path.exists(resPath):
-        raise ValueError(f"The path '{resPath}' does not exist.")
     if not os.path.isdir(resPath):
-        raise ValueError(f"The path '{resPath}' is not a directory.")
+        raise ValueError(f"The path '{resPath}' does not exist or is not a directory.")
     if not resPath.endswith("res"):
         raise ValueError(
             f"The path '{resPath}' does not end with 'res'. This script is intended for "
@@ -116,19 +116,27 @@ def PrintCacheTree(obj: c4d.BaseObject, indent: int = 0, prefix: str = "") -> No
     if not isinstance(obj, c4d.BaseObject):
         return
 
-    # Print the current node.
-    tab = "\t" * indent
-    print(f"{tab}{prefix} {obj.GetName()}({obj.GetTypeName()})")
-
-    # Get the caches of the node and recurse for each of them.
-    for prefix, cache in (("[cache]", obj.GetCache()),
-                          ("[deform cache]", obj.GetDeformCache())):
-        if cache:
-            PrintCacheTree(cache, indent + 1, prefix)
-
-    # Traverse the children of the node.
-    for child in obj.GetChildren():
-        PrintCacheTree(child, indent + 1, "[child]")
+    # Traverse the tree iteratively with a stack instead of recursing, and collect all lines so
+    # that they can be printed with a single call, as each print to the console is costly.
+    lines: list[str] = []
+    stack: list[tuple[c4d.BaseObject, int, str]] = [(obj, indent, prefix)]
+    while stack:
+        node, level, label = stack.pop()
+
+        # Add the line for the current node.
+        tab = "\t" * level
+        lines.append(f"{tab}{label} {node.GetName()}({node.GetTypeName()})")
+
+        # Push the children and then the caches of the node. The stack is last in, first out, so
+        # both are pushed in reverse order, so that the caches are printed before the children.
+        for child in reversed(node.GetChildren()):
+            stack.append((child, level + 1, "[child]"))
+        for label, cache in (("[deform cache]", node.GetDeformCache()),
+                             ("[cache]", node.GetCache())):
+            if cache:
+                stack.append((cache, level + 1, label))
+
+    print("\n".join(lines))
 
 
 def GetCaches(node: c4d.BaseObject) -> None:
@@ -32,13 +32,27 @@ __license__ = "Apache-2.0 License"
 __version__ = "2024.0.0+"
 
 import c4d
+import itertools
+import typing
 
 doc: c4d.documents.BaseDocument  # The currently active document.
 op: c4d.PolygonObject | None  # The primary selected object in `doc`. Can be `None`.
 
+# The orders in which the four vertices of a polygon must be visited, so that the local edge with 
+# the index of the respective entry becomes the edge AB, e.g., for the local edge 1 (BC) the order
+# is B, C, D, A. Looking up these orders is cheaper than slicing and joining lists for each polygon.
+EDGE_ROTATIONS: tuple[tuple[int, int, int, int], ...] = (
+    (0, 1, 2, 3), (1, 2, 3, 0), (2, 3, 0, 1), (3, 0, 1, 2))
+
 def main() -> None:
     """Called by Cinema 4D when the script is being executed.
     """
+    # Bind the functions and types we use in the loops below to local names, so that they must not
+    # be looked up as attributes of the c4d module over and over again.
+    MixVec: typing.Callable = c4d.utils.MixVec
+    MixNum: typing.Callable = c4d.utils.MixNum
+    CPolygon: typing.Type[c4d.CPolygon] = c4d.CPolygon
+
     # Make sure we have a polygon object selected with at least one edge selected. Then figure out
     # if the user is pressing the Shift key to toggle between quadrangle and triangle mode.
     if not isinstance(op, c4d.PolygonObject) or op.GetEdgeS().GetCount() < 1:
@@ -66,18 +80,35 @@ def main() -> None:
     # Get the raw edge selection of the object and convert them into a list of raw selected edge 
     # indices. The total number of edges in a mesh is always four times the number of polygons, 
     # because Cinema 4D always stores meshes as sets of quads, even when some of the polygons are 
-    # triangles or n-gons.
+    # triangles or n-gons. We use `itertools.compress` to filter the selection states, so that the
+    # scan over all edges, of which usually only few are selected, is not done in a Python loop.
     activeEdgeSelection: c4d.BaseSelect = op.GetEdgeS()
     edgeCount: int = op.GetPolygonCount() * 4
-    selectedEdges: list[int] = [
-        i for i, value in enumerate(activeEdgeSelection.GetAll(edgeCount)) if value]
+    selectedEdges: list[int] = list(
+        itertools.compress(range(edgeCount), activeEdgeSelection.GetAll(edgeCount)))
 
-    # Get all the polygons, points, and UVW data of the polygon object.
+    # The selection can contain indices beyond the current edges of the object, e.g., when it has
+    # not been updated after the topology of the object changed. So, the filtered selection can be
+    # empty even though the selection itself is not.
+    if not selectedEdges:
+        return c4d.gui.MessageDialog("Please select a polygon object with at least one edge selected.")
+
+    # Get all the polygons and points of the polygon object.
     polygons: list[c4d.CPolygon] = op.GetAllPolygons()
     points: list[c4d.Vector] = op.GetAllPoints()
-    uvwTag: c4d.UVWTag | None = op.GetTag(c4d.Tuvw)
-    uvwData: list[list[c4d.Vector]] = [
-        list(uvwTag.GetSlow(i).values()) for i in range(uvwTag.GetDataCount())] if uvwTag else []
+
+    # Sort the tags of the object we support into their kinds in a single pass over all tags.
+    uvwTag: c4d.UVWTag | None = None
+    mapTags: list[c4d.VariableTag] = []
+    colorTags: list[c4d.VertexColorTag] = []
+    for tag in op.GetTags():
+        tagType: int = tag.GetType()
+        if tagType == c4d.Tuvw and uvwTag is None:
+            uvwTag = tag
+        elif tagType == c4d.Tvertexmap:
+            mapTags.append(tag)
+        elif tagType == c4d.Tvertexcolor:
+            colorTags.append(tag)
 
     # To update geometry by both adding and removing elements, it is often easiest to first 
     # collect and remove all elements that must be removed, to only then add the new elements. 
@@ -89,44 +120,60 @@ def main() -> None:
     # determined everything that has to be removed.
 
     # We will use this data structure to store things we have to split, i.e., remove and then later
-    # replace by new things. While filling it, we will remove these things from #polygons and 
-    # #uvwData.
-    splitData: dict[int,                    # Index of the polygon to split.
-                    tuple[                  # Data for this split operation.
+    # replace by new things. Once it is filled, we will remove these things from #polygons. We only
+    # ever iterate over it in order, so a list is enough, we do not need a dictionary for it.
+    splitData: list[tuple[                  # Data for this split operation.
                         int,                # Local edge in the polygon to split.
                         c4d.CPolygon,       # Polygon to split.
                         list[c4d.Vector]]   # UVW coordinates of the polygon.
-                    ] = {}
+                    ] = []
     
+    # The indices of all polygons we are going to split. We use it to detect polygons which should be
+    # split more than once, before we do any other work for an edge, and to test if a polygon is
+    # being split.
+    splitPids: set[int] = set()
+
     # --- Remove data to split ---
     
     # Iterate over our raw selected edge indices and and determine the polygon index and local edge
     # their associated with, to then update our data structures.
     for rawEdgeIndex in selectedEdges:
-        pid: int = rawEdgeIndex // 4 # The polygon index for the raw edge index. It is the
-                                     # integer division of the raw edge index by 4 because each
-                                     # polygon has exactly 4 edges. 
-                                     # E.g., rawIndex = 9 -> pid = 9 // 2 = 2
-        eid: int = rawEdgeIndex % 4  # The index between 0 and 3 inside the polygon referenced by
-                                     # the raw edge index. It is the modulo of the raw edge index 
-                                     # and 4 because each polygon has exactly 4 edges, so the local 
-                                     # edge index is the remainder of the index divided by 4.
-                                     # E.g., rawIndex = 9 -> eid = 9 % 2 = 1, where 0 would then mean
-                                     # AB, 1 would mean BC, 2 would mean CD and 3 would mean DA.
+        # #pid is the polygon index for the raw edge index. It is the integer division of the raw 
+        # edge index by 4 because each polygon has exactly 4 edges. E.g., rawIndex = 9 -> pid = 
+        # 9 // 4 = 2. #eid is the index between 0 and 3 inside the polygon referenced by the raw 
+        # edge index. It is the modulo of the raw edge index and 4 because each polygon has exactly 
+        # 4 edges, so the local edge index is the remainder of the index divided by 4. E.g., 
+        # rawIndex = 9 -> eid = 9 % 4 = 1, where 0 would then mean AB, 1 would mean BC, 2 would 
+        # mean CD and 3 would mean DA. `divmod` computes both values with a single call.
+        pid, eid = divmod(rawEdgeIndex, 4)
 
         # Make sure that we do not try to split the same polygon multiple times.
-        if pid in splitData:
+        if pid in splitPids:
             return c4d.gui.MessageDialog(
                 f"This edge selection attempts to split the polygon with the ID {pid} more than "
                 "once. Doing that is not supported by this script. Please select only select one "
                 "edge per polygon.")
+        splitPids.add(pid)
         
-        # Remove the polygon and uvw data from our things to keep and add them to the list of
-        # our to be processed things.
-        _pid: int = pid - len(splitData) # Shift the pid by the count of polygons we already removed
-        poly: c4d.CPolygon = polygons.pop(_pid)
-        uvw: dict[str, c4d.Vector] = uvwData.pop(_pid) if uvwData else []
-        splitData[pid] = (eid, poly, uvw)
+        # Add the polygon and uvw data to the list of our to be processed things. We only read the
+        # UVW data of the polygons we split here, instead of reading the UVW data of all polygons.
+        poly: c4d.CPolygon = polygons[pid]
+        uvw: list[c4d.Vector] = list(uvwTag.GetSlow(pid).values()) if uvwTag else []
+        splitData.append((eid, poly, uvw))
+
+    # Remove the polygons we are going to split from our things to keep. We do this in a single pass
+    # instead of popping each element, as popping an element from a list must move all elements 
+    # after it, i.e., we would copy the list over and over again.
+    polygons = [poly for i, poly in enumerate(polygons) if i not in splitPids]
+
+    # All polygons before the first polygon we split keep their index, so their UVW data does not
+    # change. We therefore only read the UVW data of the polygons after it which we keep, they will 
+    # be shifted towards the front. #uvwData holds the UVW data for the polygons starting at the
+    # index #firstPid.
+    firstPid: int = min(splitPids)
+    uvwData: list[list[c4d.Vector]] = [
+        list(uvwTag.GetSlow(i).values()) for i in range(firstPid, uvwTag.GetDataCount()) 
+        if i not in splitPids] if uvwTag else []
 
     # --- Add new data by processing the removed data ---
 
@@ -145,27 +192,44 @@ def main() -> None:
                                    # points to get the value for the mid point.
                     ] = {}
 
+    # The index of the mid point of each edge we already split, so that polygons sharing an edge
+    # also share its mid point. An edge is identified by its two point indices in ascending order,
+    # as the edge AB of polygon P is the edge BA of polygon Q. Looking up a mid point this way is
+    # much cheaper than searching the list of points for a point with the same position.
+    midPointIndices: dict[tuple[int, int], int] = {}
+
+    # We add the new polygons, UVW data, and selected edges by appending them one by one. Extending
+    # a list with `+= [...]` would first build a temporary list for the right hand side in each
+    # iteration, just to throw it away again. We also bind the append methods once.
+    appendPolygon: typing.Callable = polygons.append
+    appendUvw: typing.Callable = uvwData.append
+    appendEdge: typing.Callable = newEdgeSelection.append
+
     # Start iterating over the data of the be split polygons we created before, and build the new
     # polygons and UVW data from it. We will also create a new point for the mid point of the edge
     # we split, and store the point indices of the two points that were used to create that mid
     # point in the #pointData dictionary. This way we can later update vertex maps and vertex colors
     # by linearly interpolating the values of the two points that were used to create the mid point.
-    for _, (eid, poly, uvw) in splitData.items():
+    for eid, poly, uvw in splitData:
         
         # Get the point indices of the polygon and then shift them by the local edge index, so that
         # our edge #eid to split is always #a - #b. E.g. [A, B, C, D] shifted by eid = 1 --> 
         # [B, C, D, A] or by eid = 2 --> [C, D, A, B]. If you want to, you can also write this as an 
         # if-block.
-        polyPointIndices: list[int] = [poly.a, poly.b, poly.c, poly.d]
-        a, b, c, d = polyPointIndices[eid:] + polyPointIndices[:eid]
-
-        # Calculate the mid point for the edge AB to split and add it to the list of points, unless 
-        # that point already exists from another polygon we handled. #mid is the index of that
-        # point to be used by polygons.
-        mpoint: c4d.Vector = c4d.utils.MixVec(points[a], points[b], 0.5)
-        mid: int = points.index(mpoint) if mpoint in points else len(points)
-        pointData[mid] = [a, b]
-        points.append(mpoint)
+        i, j, k, l = EDGE_ROTATIONS[eid]
+        polyPointIndices: tuple[int, int, int, int] = (poly.a, poly.b, poly.c, poly.d)
+        a, b, c, d = (polyPointIndices[i], polyPointIndices[j], 
+                      polyPointIndices[k], polyPointIndices[l])
+
+        # Determine the index of the mid point for the edge AB to split, unless that point already
+        # exists from another polygon we handled. #mid is the index of that point to be used by
+        # polygons. The mid points themselves are only computed once we know all of them.
+        key: tuple[int, int] = (a, b) if a < b else (b, a)
+        mid: int | None = midPointIndices.get(key, None)
+        if mid is None:
+            mid = len(points) + len(pointData)
+            midPointIndices[key] = mid
+            pointData[mid] = [a, b]
 
         # Create the new polygons and UVWs for edge we just split.
 
@@ -176,55 +240,73 @@ def main() -> None:
             # Add the new split polygons. As always, order of points - the winding direction - 
             # matters, as it will determine the direction the polygon is facing. See the more basic 
             # polygon examples for details on winding order and how tris and quads are defined.
-            polygons += [c4d.CPolygon(a, mid, d, d), # A tri, the last index is repeated.
-                         c4d.CPolygon(mid, b, c, d)] # A quad, all indices are unique.
+            appendPolygon(CPolygon(a, mid, d, d)) # A tri, the last index is repeated.
+            appendPolygon(CPolygon(mid, b, c, d)) # A quad, all indices are unique.
             # UVWs a more or less mirroring the polygons, so we just have to repeat for them, what
             # we did above. Linearly interpolating the UVW coordinates is probably not the best way
             # to do this, but this is just a simple example, so it will do.
             if uvw:
-                uva, uvb, uvc, uvd = uvw[eid:] + uvw[:eid]
-                uvMid: c4d.Vector = c4d.utils.MixVec(uva, uvb, 0.5)
-                uvwData += [[uva, uvMid, uvd, uvd], # the tri
-                            [uvMid, uvb, uvc, uvd]] # the quad
+                uva, uvb, uvc, uvd = uvw[i], uvw[j], uvw[k], uvw[l]
+                uvMid: c4d.Vector = MixVec(uva, uvb, 0.5)
+                appendUvw([uva, uvMid, uvd, uvd]) # the tri
+                appendUvw([uvMid, uvb, uvc, uvd]) # the quad
         # The user is pressing Shift, so we create three tris instead of a quad and a tri.
         else:
-            polygons += [c4d.CPolygon(a, mid, d, d), # These are all tris.
-                         c4d.CPolygon(mid, b, c, c),
-                         c4d.CPolygon(mid, c, d, d)]
+            appendPolygon(CPolygon(a, mid, d, d)) # These are all tris.
+            appendPolygon(CPolygon(mid, b, c, c))
+            appendPolygon(CPolygon(mid, c, d, d))
             if uvw:
-                uva, uvb, uvc, uvd = uvw[eid:] + uvw[:eid]
-                uvMid: c4d.Vector = c4d.utils.MixVec(uva, uvb, 0.5)
-                uvwData += [[uva, uvMid, uvd, uvd],
-                            [uvMid, uvb, uvc, uvc],
-                            [uvMid, uvc, uvd, uvd]]
+                uva, uvb, uvc, uvd = uvw[i], uvw[j], uvw[k], uvw[l]
+                uvMid: c4d.Vector = MixVec(uva, uvb, 0.5)
+                appendUvw([uva, uvMid, uvd, uvd])
+                appendUvw([uvMid, uvb, uvc, uvc])
+                appendUvw([uvMid, uvc, uvd, uvd])
                 
         # Write our new edge selection data. Since we only have to select edges that are topologically
         # part of the old edge, we always only select two edges, no matter if we created two or three
         # polygons. We write the polygons index times four - (lastPid + n) * 4 - offset by the local
         # edge index. Since we shifted our polygons above, so that our edge in question is always
         # AB, we just add 0.
-        newEdgeSelection += [(lastPid + 0) * 4 + 0, # Edge AB of the first polygon.
-                             (lastPid + 1) * 4 + 0] # Edge AB of the second polygon.
+        appendEdge((lastPid + 0) * 4 + 0) # Edge AB of the first polygon.
+        appendEdge((lastPid + 1) * 4 + 0) # Edge AB of the second polygon.
+
+    # Compute all mid points in one go and add them to the list of points. #pointData is ordered
+    # by the mid point indices, as we assigned them in ascending order.
+    points += [MixVec(points[a], points[b], 0.5) for a, b in pointData.values()]
 
     # --- Update the polygon object by writing our processed data back to it ---
 
     # Now we write our data back, wrapped into and undo to consolidate all the change we make.
     doc.StartUndo()
 
+    # Add undo steps for the object and all the tags we are going to modify in one go, before we
+    # change any of them.
+    undoItems: list[c4d.BaseList2D] = [op] + mapTags + colorTags
+    if uvwTag:
+        undoItems.append(uvwTag)
+    for item in undoItems:
+        doc.AddUndo(c4d.UNDOTYPE_CHANGE, item)
+
     # Write the new points and polygons back to the polygon object.
-    doc.AddUndo(c4d.UNDOTYPE_CHANGE, op)
     op.ResizeObject(len(points), len(polygons))
     op.SetAllPoints(points)
-    for i, poly in enumerate(polygons):
-        op.SetPolygon(i, poly)
 
-    op.Message(c4d.MSG_UPDATE)
+    # There is no SetAllPolygons, so we must write the polygons one by one. ResizeObject preserves
+    # the existing polygons, and all polygons before the first one we split are unchanged, so we only
+    # write the polygons from there on. We also bind the method once instead of looking it up for
+    # each polygon.
+    setPolygon: typing.Callable = op.SetPolygon
+    for i in range(firstPid, len(polygons)):
+        setPolygon(i, polygons[i])
 
     # Now that we have updated the geometry, we can update the edge selection of the object. We can
-    # just keep using the selection we accessed at the beginning.
-    activeEdgeSelection.DeselectAll()
+    # just keep using the selection we accessed at the beginning. Instead of deselecting everything
+    # and then selecting edge by edge, we build the selection states for all edges and write them
+    # with a single call. This also deselects all edges which are not part of the new selection.
+    states: list[bool] = [False] * (len(polygons) * 4)
     for rawEdgeIndex in newEdgeSelection:
-        activeEdgeSelection.Select(rawEdgeIndex)
+        states[rawEdgeIndex] = True
+    activeEdgeSelection.SetAll(states)
 
     # We could sanity check our selection with this code. We are writing here a raw selection. So,
     # when there is are the polygons P and Q with a shared edge E, represented by the raw edges
@@ -242,47 +324,58 @@ def main() -> None:
 
     # Update vertex maps by using our #pointData dictionary to write the linearly interpolated value
     # between the two points we split.
-    mapTags: list[c4d.VariableTag] = [t for t in op.GetTags() if t.CheckType(c4d.Tvertexmap)]
     for tag in mapTags:
-        # Use the abstract VariableTag interface to access the weight data.
-        weights: list[float] = tag.GetAllHighlevelData()
-        for mid, (a, b) in pointData.items():
-            weights[mid] = c4d.utils.MixNum(weights[a], weights[b], 0.5)
+        # Use the abstract VariableTag interface to access the weight data. We write directly into
+        # the low-level buffer of the tag, a vertex map stores one 32 bit float per point. This way
+        # we only touch the weights of the mid points, instead of copying all weights of the tag
+        # into a list and then writing them all back just to change a few of them.
+        buffer: memoryview | None = tag.GetLowlevelDataAddressW()
+        if buffer is not None:
+            weights: memoryview = memoryview(buffer).cast("B").cast("f")
+            for mid, (a, b) in pointData.items():
+                weights[mid] = MixNum(weights[a], weights[b], 0.5)
+        # Fall back to the high-level interface when the buffer could not be accessed.
+        else:
+            weights: list[float] = tag.GetAllHighlevelData()
+            for mid, (a, b) in pointData.items():
+                weights[mid] = MixNum(weights[a], weights[b], 0.5)
+            tag.SetAllHighlevelData(weights)
 
-        # Write the modified weights back to the tag and update it.
-        doc.AddUndo(c4d.UNDOTYPE_CHANGE, tag)
-        tag.SetAllHighlevelData(weights)
         tag.Message(c4d.MSG_UPDATE)
 
     # Same thing but for vertex colors. We could also use the abstract VariableTag interface
     # here, but since there is a special interface for vertex color tags in Python, we will use 
     # it instead.
-    colorTags: list[c4d.VertexColorTag] = [t for t in op.GetTags() if t.CheckType(c4d.Tvertexcolor)]
     for tag in colorTags:
-        doc.AddUndo(c4d.UNDOTYPE_CHANGE, tag)
         if not tag.IsPerPointColor():
             tag.SetPerPointMode(True)
 
+        # We bind the accessor methods once instead of looking them up for each mid point.
         data: object = tag.GetDataAddressW()
+        getColor, getAlpha = tag.GetColor, tag.GetAlpha
+        setColor, setAlpha = tag.SetColor, tag.SetAlpha
         for mid, (a, b) in pointData.items():
-            aColor: c4d.Vector = tag.GetColor(data, None, None, a)
-            aAlpha: float = tag.GetAlpha(data, None, None, a)
-            bColor: c4d.Vector = tag.GetColor(data, None, None, b)
-            bAlpha: float = tag.GetAlpha(data, None, None, b)
-            tag.SetColor(data, None, None, mid, c4d.utils.MixVec(aColor, bColor, 0.5))
-            tag.SetAlpha(data, None, None, mid, c4d.utils.MixNum(aAlpha, bAlpha, 0.5))
+            aColor: c4d.Vector = getColor(data, None, None, a)
+            aAlpha: float = getAlpha(data, None, None, a)
+            bColor: c4d.Vector = getColor(data, None, None, b)
+            bAlpha: float = getAlpha(data, None, None, b)
+            setColor(data, None, None, mid, MixVec(aColor, bColor, 0.5))
+            setAlpha(data, None, None, mid, MixNum(aAlpha, bAlpha, 0.5))
         
         tag.Message(c4d.MSG_UPDATE)
 
-    # And finally, we update the UVW data, here we just write what we have computed before.
+    # And finally, we update the UVW data, here we just write what we have computed before. Just as
+    # for the polygons, we only write the UVW data starting at the first polygon we split.
     if uvwTag:
-        doc.AddUndo(c4d.UNDOTYPE_CHANGE, uvwTag)
-        for i, uvw in enumerate(uvwData):
+        for i, uvw in enumerate(uvwData, firstPid):
             uvwTag.SetSlow(i, *uvw)
 
-        # Update the tag and the object.
         uvwTag.Message(c4d.MSG_UPDATE)
-        op.Message(c4d.MSG_UPDATE)
+
+    # Notify the object once that its data has changed, after we have updated the geometry and all
+    # of its tags. Sending the message earlier as well would only cause Cinema 4D to do the same
+    # internal update work twice.
+    op.Message(c4d.MSG_UPDATE)
 
     # End the undo step and signal Cinema 4D that the viewport and GUI must be updated.
     doc.EndUndo()
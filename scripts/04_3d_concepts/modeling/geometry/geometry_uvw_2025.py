@@ -28,34 +28,104 @@ __license__ = "Apache-2.0 License"
 __version__ = "2025.1.0"
 
 import c4d
+import operator
 import typing
 import mxutils
 
 doc: c4d.documents.BaseDocument  # The currently active document.
 op: typing.Optional[c4d.BaseObject]  # The selected object within that active document. Can be None.
 
+# The orientation and point of the plane into which the sphere is projected, there is nothing 
+# special about these values, they just look good for this example. They are constants, so we 
+# compute them once here instead of each time the uvw data is generated.
+PROJECTION_NORMAL: c4d.Vector = c4d.Vector(1, 1, 0).GetNormalized()
+PROJECTION_ORIGIN: c4d.Vector = c4d.Vector(0)
+
 def GenerateUvwData(geometries: tuple[c4d.PolygonObject]) -> None:
     """Demonstrates how to generate UVW data for polygon objects.
     """
-    def MapVector(value: c4d.Vector, inMin: c4d.Vector, inMax: c4d.Vector) -> c4d.Vector:
-        """Maps a vector from a given range to the values 0 to 1.
+    def GetUnitSquareMapping(inMin: c4d.Vector, inMax: c4d.Vector) -> c4d.Matrix:
+        """Returns a matrix which maps vectors from a given range to the values 0 to 1.
         """
         # Put the z component of our input into the x component of the output, because UV are the
         # relevant components for a 2D UV(W) vector, and because the points in the planes in this
         # example lie in the x/z plane, so we move z to y(v) and then leave z(w) empty as we are
-        # not generating 3D texture mapping data.
-        return c4d.Vector(
-            c4d.utils.RangeMap(value.x, inMin.x, inMax.x, 0, 1, True),
-            c4d.utils.RangeMap(value.z, inMin.z, inMax.z, 0, 1, True), 0)
+        # not generating 3D texture mapping data. We could use c4d.utils.RangeMap for this, but 
+        # mapping a value to [0, 1] is just scaling and offsetting it, i.e., an affine map which we 
+        # can express as a matrix. u = (x - inMin.x) / (inMax.x - inMin.x) and v = (z - inMin.z) /
+        # (inMax.z - inMin.z), the matrix columns tell where the x, y, and z input components go.
+        scaleX: float = 1.0 / (inMax.x - inMin.x)
+        scaleZ: float = 1.0 / (inMax.z - inMin.z)
+        return c4d.Matrix(off=c4d.Vector(-inMin.x * scaleX, -inMin.z * scaleZ, 0),
+                          v1=c4d.Vector(scaleX, 0, 0),
+                          v2=c4d.Vector(0, 0, 0),
+                          v3=c4d.Vector(0, scaleZ, 0))
+
+    def MapVectors(values: typing.Iterable[c4d.Vector], 
+                   transform: c4d.Matrix) -> typing.List[c4d.Vector]:
+        """Transforms all #values by #transform and clamps the results to the unit square.
+        """
+        # Because #transform is a matrix, we can combine any number of affine maps, e.g., a 
+        # projection and a mapping to the unit square, into a single transform upfront. Then each 
+        # value costs us a single matrix-vector multiplication, which we follow by clamping the 
+        # result to [0, 1]. The multiplication already gives us a new vector, so we clamp its 
+        # components in place instead of allocating yet another vector for the clamped result.
+        result: typing.List[c4d.Vector] = []
+        append: typing.Callable = result.append
+        for value in values:
+            uv: c4d.Vector = transform * value
+            if uv.x < 0.0:
+                uv.x = 0.0
+            elif uv.x > 1.0:
+                uv.x = 1.0
+            if uv.y < 0.0:
+                uv.y = 0.0
+            elif uv.y > 1.0:
+                uv.y = 1.0
+            append(uv)
+
+        return result
     
-    def ProjectIntoPlane(p: c4d.Vector, q: c4d.Vector, normal: c4d.Vector) -> c4d.Vector:
-        """Projects the point #p orthogonally into the plane defined by #q and #normal.
+    def GetPlaneProjection(q: c4d.Vector, normal: c4d.Vector) -> c4d.Matrix:
+        """Returns a matrix which projects points orthogonally into the plane defined by #q and 
+        #normal.
+        """
+        # A point #p is projected into the plane by moving it along the inverse plane normal by its
+        # distance to the plane, i.e., p' = p - normal * ((p - q) * normal). This can be rewritten as
+        # p' = M * p + normal * (q * normal) with M = I - normal * normal^T, which does not depend on
+        # #p. So, we can compute it once as a matrix and then project each point with a single 
+        # matrix-vector multiplication, instead of computing the distance for each point. The 
+        # columns of M are the unit axes minus the normal scaled by the respective normal component.
+        return c4d.Matrix(off=normal * (q * normal),
+                          v1=c4d.Vector(1, 0, 0) - normal * normal.x,
+                          v2=c4d.Vector(0, 1, 0) - normal * normal.y,
+                          v3=c4d.Vector(0, 0, 1) - normal * normal.z)
+
+    def GetPolygonIndices(obj: c4d.PolygonObject) -> typing.List[tuple[int, int, int, int]]:
+        """Returns the point indices of all polygons of #obj as plain tuples.
         """
-        # The distance from the point #p to its orthogonal projection #p' on the plane. Or, in short,
-        # the length of the shortest path (in Euclidean space) from #p to the plane.
-        distance: float = (p - q) * normal
-        # Calculate #p' by moving #p #distance units along the inverse plane normal.
-        return p - normal * distance
+        # Reading the four indices of each polygon once upfront means that the loops writing uvw
+        # data only deal with plain integers and not with CPolygon instances. An attrgetter reads
+        # all four attributes in one call and mapping it runs the loop in C instead of in Python.
+        return list(map(operator.attrgetter("a", "b", "c", "d"), obj.GetAllPolygons()))
+
+    def WriteUvwData(obj: c4d.PolygonObject, uvws: typing.List[c4d.Vector]) -> c4d.UVWTag:
+        """Creates a UVW tag on #obj and writes the uvw coordinates #uvws of its points for each 
+        polygon.
+        """
+        uvwTag: c4d.UVWTag = obj.MakeVariableTag(c4d.Tuvw, obj.GetPolygonCount())
+
+        # Iterate over all polygons and just look up the uvw coordinates of their points. The reason 
+        # why we always set uvw data for four points, is because Cinema 4D always handles polygons 
+        # as quads, even if they are triangles or n-gons. There is no method to write all uvw data
+        # at once, so we bind #SetSlow once instead of looking it up for each polygon.
+        setSlow: typing.Callable = uvwTag.SetSlow
+        for i, (a, b, c, d) in enumerate(GetPolygonIndices(obj)):
+            # Set the four uvw coordinates for the uvw-polygon #i which corresponds to the geometry 
+            # polygon #i.
+            setSlow(i, uvws[a], uvws[b], uvws[c], uvws[d])
+
+        return uvwTag
 
     # Check our inputs for being what we think they are, at least three PolygonObjects.
     mxutils.CheckIterable(geometries, c4d.PolygonObject, minCount=3)
@@ -71,101 +141,96 @@ def GenerateUvwData(geometries: tuple[c4d.PolygonObject]) -> None:
     # with a percentage of the total length of the line (u), and a percentage of the total extrusion 
     # height or lathing rotation (v), the uv coordinates of that point.
 
-    # Create a UVW tag for the plane object and get all the points of the plane object.
-    uvwTag: c4d.UVWTag = plane.MakeVariableTag(c4d.Tuvw, plane.GetPolygonCount())
+    # Get all the points of the plane object. Other than variable tags, point objects do not expose
+    # their points as a raw memory buffer in Python, so #GetAllPoints is the fastest way to read 
+    # them, as it reads all points in a single call instead of calling #GetPoint for each of them.
     points: typing.List[c4d.Vector] = plane.GetAllPoints()
 
-    # Get the radius of the plane object and iterate over all polygons to calculate the uvw data.
+    # Get the radius of the plane object and calculate the uvw coordinate for each point of the 
+    # plane. We operate here on the implicit knowledge that the plane object is centered on its 
+    # origin, e.g., goes form -radius to radius in all three dimensions. We then just map [-radius, 
+    # radius] to [0, 1], as UV data always 'goes' from 0 to 1. Since our mapping only depends on the
+    # position of a point, we compute it once per point instead of once per polygon vertex, as most
+    # points are shared by up to four polygons. #WriteUvwData then creates the UVW tag and writes
+    # the uvw coordinates of the points for each polygon.
     radius: c4d.Vector = plane.GetRad()
-    poly: c4d.CPolygon
-    for i, poly in enumerate(plane.GetAllPolygons()):
-        # Calculate the uvw data for each point of the polygon. We operate here on the implicit
-        # knowledge that the plane object is centered on its origin, e.g., goes form -radius to
-        # radius in all three dimensions. We then just map [-radius, radius] to [0, 1], as UV data
-        # always 'goes' from 0 to 1. The reason why we always calculate uvw data for four points, 
-        # is because Cinema 4D always handles polygons as quads, even if they are triangles or n-gons.
-        a: c4d.Vector = MapVector(points[poly.a], -radius, radius)
-        b: c4d.Vector = MapVector(points[poly.b], -radius, radius)
-        c: c4d.Vector = MapVector(points[poly.c], -radius, radius)
-        d: c4d.Vector = MapVector(points[poly.d], -radius, radius)
-
-        # Set the four uvw coordinates for the uvw-polygon #i which corresponds to the geometry 
-        # polygon #i.
-        uvwTag.SetSlow(i, a, b, c, d)
+    WriteUvwData(plane, MapVectors(points, GetUnitSquareMapping(-radius, radius)))
 
     # Now we basically do the same for the sphere object. We could also just take the x and z 
     # components of each point to get a top-down uvw projection on the sphere. But we make it a 
     # bit more interesting by projecting each point into a plane defined by the normal of (1, 1, 0), 
     # resulting in planar projection from that angle. This is a bit more formal than projecting by 
-    # just discarding a component (the y component in the former case).
-
-    # Our projection orientation and point, there is nothing special about these values, they
-    # just look good for this example.
-    projectionNormal: c4d.Vector = c4d.Vector(1, 1, 0).GetNormalized()
-    projectionOrigin: c4d.Vector = c4d.Vector(0)
-
-    uvwTag: c4d.UVWTag = sphere.MakeVariableTag(c4d.Tuvw, sphere.GetPolygonCount())
+    # just discarding a component (the y component in the former case). The projection orientation
+    # and point are the constants PROJECTION_NORMAL and PROJECTION_ORIGIN defined at the top of this
+    # file.
     points: typing.List[c4d.Vector] = sphere.GetAllPoints()
 
+    # We project each point of the sphere into the projection plane. We must then still map the 
+    # projected points to the unit square. What we do here is not quite mathematically correct, as 
+    # there is no guarantee that the projected points have the same bounding box size as the 
+    # original sphere, but eh, close enough for this example, we at least map all values to [0, 1].
+    # The only difference to the plane is the projection, writing the data works exactly the same.
+    # Both the projection and the mapping are matrices, so we can combine them into a single 
+    # transform, where the right-hand matrix, the projection, is applied first.
     radius: c4d.Vector = sphere.GetRad()
-    poly: c4d.CPolygon
-    for i, poly in enumerate(sphere.GetAllPolygons()):
-        # We project each point of the polygon into the projection plane.
-        a: c4d.Vector = ProjectIntoPlane(points[poly.a], projectionOrigin, projectionNormal)
-        b: c4d.Vector = ProjectIntoPlane(points[poly.b], projectionOrigin, projectionNormal)
-        c: c4d.Vector = ProjectIntoPlane(points[poly.c], projectionOrigin, projectionNormal)
-        d: c4d.Vector = ProjectIntoPlane(points[poly.d], projectionOrigin, projectionNormal)
-
-        # We must still map the projected points to the unit square. What we do here is not quite
-        # mathematically correct, as there is no guarantee that the projected points have the same
-        # bounding box size as the original sphere, but eh, close enough for this example, we at
-        # least map all values to [0, 1].
-        uvwTag.SetSlow(i, 
-                       MapVector(a, -radius, radius), 
-                       MapVector(b, -radius, radius),
-                       MapVector(c, -radius, radius), 
-                       MapVector(d, -radius, radius))
+    projection: c4d.Matrix = GetPlaneProjection(PROJECTION_ORIGIN, PROJECTION_NORMAL)
+    WriteUvwData(sphere, MapVectors(points, GetUnitSquareMapping(-radius, radius) * projection))
         
     # Lastly, we can use UVCommands to generate UVW data, here at the example of the cylinder object.
     # Doing this comes with the huge disadvantage that we must be in a certain GUI state, i.e., the
     # UV tools only work if the object is in the active document and the UV tools are in a certain
     # state. This makes it impossible to use the UV tools inside a generator object's GetVirtualObjects
+    # method. It is also much slower than computing the uvw data ourselves, as the texture view must
+    # be opened and synchronized. So, when a mapping can be computed directly, as for the plane and 
+    # the sphere above, or a cubic mapping of a simple primitive, doing so is the better choice. We 
+    # use the UV command here anyway, as demonstrating it is the point of this part of the example.
     uvwTag: c4d.UVWTag = cylinder.MakeVariableTag(c4d.Tuvw, cylinder.GetPolygonCount())
 
     # Boiler plate code for UV commands to work, see dedicated #CallUVCommand example for details.
+    # We only change the GUI state where it is not already what we need, as each change causes
+    # Cinema 4D to update its GUI.
     doc: c4d.documents.BaseDocument = mxutils.CheckType(sphere.GetDocument())
-    doc.SetActiveObject(cylinder)
+    if doc.GetActiveObject() != cylinder:
+        doc.SetActiveObject(cylinder)
 
     oldMode: int = doc.GetMode()
-    if doc.GetMode() not in [c4d.Muvpoints, c4d.Muvpolygons]:
+    if oldMode not in [c4d.Muvpoints, c4d.Muvpolygons]:
         doc.SetMode(c4d.Muvpolygons)
 
     cmdTextureView: int = 170103
+    didOpenTextureView: bool = False
     if not c4d.IsCommandChecked(cmdTextureView):
         c4d.CallCommand(cmdTextureView)
         c4d.modules.bodypaint.UpdateMeshUV(False)
         didOpenTextureView = True
 
-    handle: c4d.modules.bodypaint.TempUVHandle = mxutils.CheckType(
-        c4d.modules.bodypaint.GetActiveUVSet(doc, c4d.GETACTIVEUVSET_ALL))
-    
-    # Retrieve the internal UVW data for the current texture view and then invoke
-    # the #UVCOMMAND_OPTIMALCUBICMAPPING command, mapping our cylinder object.
-
-    uvw: list[dict] = mxutils.CheckType(handle.GetUVW())
-    settings: c4d.BaseContainer = c4d.BaseContainer()
-    if not c4d.modules.bodypaint.CallUVCommand(
-        handle.GetPoints(), handle.GetPointCount(), handle.GetPolys(), handle.GetPolyCount(),
-        uvw, handle.GetPolySel(), handle.GetUVPointSel(), cylinder, handle.GetMode(),
-        c4d.UVCOMMAND_OPTIMALCUBICMAPPING, settings):
-        raise RuntimeError("CallUVCommand failed.")
-
-    # Write the updated uvw data back.
-    if not handle.SetUVWFromTextureView(uvw, True, True, True):
-        raise RuntimeError("Failed to write Bodypaint uvw data back.")
-    
-    c4d.modules.bodypaint.FreeActiveUVSet(handle)
-    doc.SetMode(oldMode)
+    # Restore the GUI state in a finally block, so that we also do it when something goes wrong,
+    # including when we cannot retrieve the active UV set.
+    handle: c4d.modules.bodypaint.TempUVHandle | None = None
+    try:
+        handle = mxutils.CheckType(
+            c4d.modules.bodypaint.GetActiveUVSet(doc, c4d.GETACTIVEUVSET_ALL))
+
+        # Retrieve the internal UVW data for the current texture view and then invoke
+        # the #UVCOMMAND_OPTIMALCUBICMAPPING command, mapping our cylinder object.
+        uvw: list[dict] = mxutils.CheckType(handle.GetUVW())
+        settings: c4d.BaseContainer = c4d.BaseContainer()
+        if not c4d.modules.bodypaint.CallUVCommand(
+            handle.GetPoints(), handle.GetPointCount(), handle.GetPolys(), handle.GetPolyCount(),
+            uvw, handle.GetPolySel(), handle.GetUVPointSel(), cylinder, handle.GetMode(),
+            c4d.UVCOMMAND_OPTIMALCUBICMAPPING, settings):
+            raise RuntimeError("CallUVCommand failed.")
+
+        # Write the updated uvw data back.
+        if not handle.SetUVWFromTextureView(uvw, True, True, True):
+            raise RuntimeError("Failed to write Bodypaint uvw data back.")
+    finally:
+        if handle is not None:
+            c4d.modules.bodypaint.FreeActiveUVSet(handle)
+        if didOpenTextureView:
+            c4d.CallCommand(cmdTextureView)
+        if doc.GetMode() != oldMode:
+            doc.SetMode(oldMode)
 
     return
 
@@ -180,12 +245,17 @@ def BuildGeometry(doc: c4d.documents.BaseDocument) -> tuple[c4d.PolygonObject, c
     sphereGen: c4d.BaseObject = mxutils.CheckType(c4d.BaseObject(c4d.Osphere), c4d.BaseObject)
     cylinderGen: c4d.BaseObject = mxutils.CheckType(c4d.BaseObject(c4d.Ocylinder), c4d.BaseObject)
 
-    # Insert the generators into a temporary document to build their caches.
+    # Insert the generators into a temporary document to build their caches. Building the caches is
+    # the most expensive part of this function, but we cannot cache its results across runs, as a
+    # Script Manager script is executed anew each time it is run, i.e., module attributes do not
+    # survive between runs. We would also have to clone cached objects anyway, as each run inserts
+    # them into a document.
     temp: c4d.documents.BaseDocument = c4d.documents.BaseDocument()
     temp.InsertObject(planeGen)
     temp.InsertObject(sphereGen)
     temp.InsertObject(cylinderGen)
-    if not temp.ExecutePasses(None, False, False, True, c4d.BUILDFLAGS_0):
+    # We only build the caches, i.e., neither animations nor expressions are executed.
+    if not temp.ExecutePasses(None, False, False, True, c4d.BUILDFLAGS_NONE):
         raise RuntimeError("Could not build the cache for plane and sphere objects.")
 
     # Retrieve the caches of the generators.
@@ -207,10 +277,11 @@ def BuildGeometry(doc: c4d.documents.BaseDocument) -> tuple[c4d.PolygonObject, c
     sphere.SetMg(c4d.Matrix(off=c4d.Vector(0, 0, 0)))
     cylinder.SetMg(c4d.Matrix(off=c4d.Vector(300, 0, 0)))
 
-    # Insert the result the passed document and return them.
-    doc.InsertObject(plane)
-    doc.InsertObject(sphere)
-    doc.InsertObject(cylinder)
+    # Insert the result the passed document and return them. For insertions the undo has to be 
+    # added after the operation.
+    for node in [plane, sphere, cylinder]:
+        doc.InsertObject(node)
+        doc.AddUndo(c4d.UNDOTYPE_NEWOBJ, node)
 
     return plane, sphere, cylinder
 
@@ -224,12 +295,14 @@ def ApplyMaterials(geometries: tuple[c4d.PolygonObject]) -> None:
 
     # Enable the standard renderer in the document.
     renderData: c4d.BaseContainer = doc.GetActiveRenderData()
+    doc.AddUndo(c4d.UNDOTYPE_CHANGE_SMALL, renderData)
     renderData[c4d.RDATA_RENDERENGINE] = c4d.RDATA_RENDERENGINE_STANDARD
 
     # Create the checkerboard material and apply it to the geometries.
     material: c4d.BaseMaterial = mxutils.CheckType(c4d.BaseMaterial(c4d.Mmaterial), c4d.BaseMaterial)
     shader: c4d.BaseShader = mxutils.CheckType(c4d.BaseShader(c4d.Xcheckerboard), c4d.BaseShader)
     doc.InsertMaterial(material)
+    doc.AddUndo(c4d.UNDOTYPE_NEWOBJ, material)
 
     material.InsertShader(shader)
     material[c4d.MATERIAL_COLOR_SHADER] = shader
@@ -243,10 +316,13 @@ def main(doc: c4d.documents.BaseDocument) -> None:
     """
     # Construct the plane, sphere, and cylinder geometry, then generate the UVW data, and apply a 
     # material to the geometries, finally update the document with #EventAdd. Except for the 
-    # #GenerateUvwData call, this is all boilerplate code.
+    # #GenerateUvwData call, this is all boilerplate code. All changes are wrapped into a single 
+    # undo step and Cinema 4D is only informed once at the very end about them.
+    doc.StartUndo()
     geometries: tuple[c4d.PolygonObject] = BuildGeometry(doc)
     GenerateUvwData(geometries)
     ApplyMaterials(geometries)
+    doc.EndUndo()
 
     c4d.EventAdd()
 
@@ -25,8 +25,6 @@ __date__ = "27/02/2025"
 __license__ = "Apache-2.0 License"
 __version__ = "2025.2.0"
 
-import itertools
-import struct
 import os
 import platform
 
@@ -43,10 +41,14 @@ def EnsureIsOcioDocument(doc: c4d.documents.BaseDocument) -> None:
     When the document is not in OCIO color management mode, the method will switch the document to
     OCIO color management mode and update the OCIO color spaces. This does NOT entail a conversion
     of the colors of scene elements to OCIO. One usually has to call something like this each
-    time one requires/assumes a scene to be in an OCIO scene for the following operations.
+    time one requires/assumes a scene to be in an OCIO scene for the following operations. Doing so
+    is cheap, as the expensive part, updating the OCIO color spaces, is only carried out when the
+    color management mode of the document actually had to be changed. So, there is no need to 
+    remember which documents have been ensured before, which could also become wrong when the user 
+    changes the mode in the meantime.
     """
     mxutils.CheckType(doc, c4d.documents.BaseDocument)
-    if doc[c4d.DOCUMENT_COLOR_MANAGEMENT] is not c4d.DOCUMENT_COLOR_MANAGEMENT_OCIO:
+    if doc[c4d.DOCUMENT_COLOR_MANAGEMENT] != c4d.DOCUMENT_COLOR_MANAGEMENT_OCIO:
         doc[c4d.DOCUMENT_COLOR_MANAGEMENT] = c4d.DOCUMENT_COLOR_MANAGEMENT_OCIO
         doc.UpdateOcioColorSpaces()
         if c4d.threading.GeIsMainThreadAndNoDrawThread():
@@ -144,7 +146,9 @@ def ConvertOcioColors(doc: c4d.documents.BaseDocument) -> None:
 
     # Finally, an OCIO converter also allows you to carry out batch conversions. Here we convert
     # the input #colors from non-linear to linear sRGB space, i.e., we shift #colors from a gamma
-    # of ~2.1 to a gamma of 1.
+    # of ~2.1 to a gamma of 1. When you must convert many colors with the same transform, you should
+    # collect them and convert them with a single TransformColors call, instead of calling 
+    # TransformColor for each of them, as each call must cross from Python into Cinema 4D.
     colors: list[c4d.Vector] = [c4d.Vector(1, 0, 0), c4d.Vector(0, 1, 0), c4d.Vector(0, 0, 1)]
     colorsTransformed: list[maxon.Vector64] = converter.TransformColors(
         colors, c4d.COLORSPACETRANSFORMATION_SRGB_TO_LINEAR)
@@ -200,29 +204,34 @@ def ConvertOcioColorsArbitrarily(doc: c4d.documents.BaseDocument) -> None:
     # render space profile.
 
     # Here we are packing up int data as an array of bytes because #Convert expects an maxon::PIX
-    # array which is an alias for an UChar array expressing 8bit integers. In Python we must use
-    # struct.pack() to convert a list of integers to a byte array. For large data this will be quite
-    # slow, with no good way to speed it up. 
+    # array which is an alias for an UChar array expressing 8bit integers. A bytearray can be 
+    # directly constructed from a list of integers in the interval [0, 255], there is no need to
+    # pack the values with struct.pack().
     inColors: list[int] = [255, 0, 0, 0, 255, 0, 0, 0, 255]
-    inBuffer: bytearray = bytearray(struct.pack(f"{len(inColors)}B", *inColors))
+    inBuffer: bytearray = bytearray(inColors)
 
-    # Allocate a nulled output buffer of the same size (which is much faster than converting a 
-    # bunch of nulls with struct.pack()).
+    # Allocate a nulled output buffer of the same size. When converting many buffers of the same 
+    # size, e.g., the frames of an animation, one should allocate the output buffer once and then
+    # reuse it for each conversion, instead of allocating a new one each time.
     outBuffer: bytearray = bytearray(len(inBuffer))
 
     # Carry out the conversion of the colors from the input profile to the output profile. The #cnt
-    # tells the call how many colors are to be converted, i.e., the length of the buffers. The #skip
-    # values are for respecting padding in the input and output buffers, which we do not have here.
-    converter.Convert(src=inBuffer, dst=outBuffer, cnt=3, 
+    # tells the call how many colors are to be converted, i.e., the length of the buffers, which we
+    # derive from the buffer size so that this works for any number of colors. The #skip values are
+    # for respecting padding in the input and output buffers, which we do not have here. For large
+    # data, such as the pixels of a bitmap, we can just pass larger buffers in the same manner.
+    converter.Convert(src=inBuffer, dst=outBuffer, cnt=len(inBuffer) // 3, 
                       skipInputComponents=0, skipOutputComponents=0)
     
     # Unpack the output buffer and define a function that converts lists of integer values to 
-    # floating point color vectors, e.g., [255, 0, 0] -> [Vector(1, 0, 0)].
-    outColors: list[int] = list(struct.unpack(f'{len(outBuffer)}B', outBuffer))
-    def ToVectors(colors: list[float]) -> list[c4d.Vector]:
-        return [c4d.Vector(
-            *(float(c)/255.0 for c in colors[i:i + 3])
-        ) for i in range(0, len(colors), 3)]
+    # floating point color vectors, e.g., [255, 0, 0] -> [Vector(1, 0, 0)]. Iterating over a 
+    # bytearray yields its values as integers, so we can just convert it to a list.
+    outColors: list[int] = list(outBuffer)
+    def ToVectors(colors: list[int]) -> list[c4d.Vector]:
+        # Zip the strided slices of the red, green, and blue values into triples, so that we neither
+        # have to slice out each color nor run a generator for its three components.
+        return [c4d.Vector(r / 255.0, g / 255.0, b / 255.0) 
+                for r, g, b in zip(colors[0::3], colors[1::3], colors[2::3])]
     
     # Print our manual conversion result.
     print(f"{ToVectors(inColors)} --{inProfileName}_TO_{outProfileName}--> {ToVectors(outColors)}")
@@ -254,11 +263,16 @@ def ConvertScenes(doc: c4d.documents.BaseDocument) -> None:
     # space of the document). The former would be a 'correct' conversion, the latter would pile an
     # extra sRGB->RenderSpace conversion on top of the colors, and would be a 'wrong' conversion.
     converter: c4d.modules.render.SceneColorConverter = c4d.modules.render.SceneColorConverter()
+    # GetActiveOcioColorSpacesNames() returns only the names of the four active OCIO spaces, the
+    # render space, display space, view transform, and view thumbnail transform, in this order. So,
+    # calling it once and picking the first name is cheap.
     renderSpaceName: str = doc.GetActiveOcioColorSpacesNames()[0]
     converter.Init(doc, "sRGB", "scene-linear Rec.709-sRGB", renderSpaceName)
 
     # We can now start converting colors as defined by #converter. The conversion is carried out
-    # in-place, i.e., the colors of the objects are directly converted.
+    # in-place, i.e., the colors of the objects are directly converted. An initialized converter can
+    # be used for any number of conversions, so we initialize it once and reuse it for all calls
+    # below. Init() must only be called again when the source or target spaces change.
 
     # Convert the colors of a singular scene element, here the first object in the scene. This will
     # convert everything attached to the object, i.e. , children and tags.
@@ -340,13 +354,27 @@ def GetSetBitmapOcioProfiles(doc: c4d.documents.BaseDocument) -> None:
     EnsureIsOcioDocument(doc)
 
     # Create a bitmap with a red to blue gradient.
+    width, height = 512, 128
     bitmap: c4d.bitmaps.BaseBitmap = c4d.bitmaps.BaseBitmap()
-    if bitmap.Init(512, 128) != c4d.IMAGERESULT_OK:
+    if bitmap.Init(width, height) != c4d.IMAGERESULT_OK:
         raise RuntimeError("Could not initialize the bitmap.")
     
-    for x, y in itertools.product(range(512), range(128)):
-        color: c4d.Vector = c4d.utils.MixVec(c4d.Vector(1, 0, 0), c4d.Vector(0, 0, 1), x / 512)
-        bitmap.SetPixel(x, y, int(color.x * 255), int(color.y * 255), int(color.z * 255))
+    # All rows of our horizontal gradient are identical. So, we compute the 8bit RGB values of a
+    # single row once, and then write that row with a single SetPixelCnt call into each line of the 
+    # bitmap, instead of calling SetPixel for each of the 65,536 pixels of the bitmap. Each pixel 
+    # takes up three bytes in the buffer, one for each of its RGB components. We allocate the buffer
+    # once in its final size and then write the components of each pixel into their slots, instead
+    # of growing the buffer pixel by pixel. Mixing red (1, 0, 0) and blue (0, 0, 1) by #t results in
+    # the color (1 - t, 0, t), so we compute the components directly instead of mixing two vectors
+    # with c4d.utils.MixVec for each pixel.
+    row: bytearray = bytearray(width * 3)
+    for x in range(width):
+        t: float = x / width
+        row[x * 3:x * 3 + 3] = (int((1.0 - t) * 255), 0, int(t * 255))
+
+    buffer: memoryview = memoryview(row)
+    for y in range(height):
+        bitmap.SetPixelCnt(0, y, width, buffer, 3, c4d.COLORMODE_RGB, c4d.PIXELCNT_0)
 
     # Clone the bitmap.
     clone: c4d.bitmaps.BaseBitmap = bitmap.GetClone()
@@ -381,12 +409,16 @@ def GetSetBitmapOcioProfiles(doc: c4d.documents.BaseDocument) -> None:
 
 @mxutils.SET_STATUS("Rendering...", doSpin=True)
 @mxutils.REPORT()
-def RenderOcioDocumentToPictureViewer(doc: c4d.documents.BaseDocument) -> None:
+def RenderOcioDocumentToPictureViewer(doc: c4d.documents.BaseDocument, 
+                                      openFile: bool = True) -> None:
     """Demonstrates how to render an OCIO document to the Picture Viewer or to a bitmap.
 
     This is mostly a workaround at the moment, we will streamline this in the future. Internally,
     things are not baked but this is only way in the SDK at the moment. As a side effect, you will
     not see the OCIO color profiles on your bitmap in the picture viewer.
+
+    When #openFile is True, the saved render file is opened in its native OS app. Pass False when
+    running the example in an automated manner, as launching an external app is slow.
     """
     EnsureIsOcioDocument(doc)
     if not doc.GetDocumentPath():
@@ -396,7 +428,7 @@ def RenderOcioDocumentToPictureViewer(doc: c4d.documents.BaseDocument) -> None:
     renderData: c4d.documents.RenderData = doc.GetActiveRenderData()
     data: c4d.BaseContainer = renderData.GetDataInstance()
 
-    requiresBaking: bool = data[c4d.RDATA_FORMATDEPTH] is c4d.RDATA_FORMATDEPTH_8
+    requiresBaking: bool = data[c4d.RDATA_FORMATDEPTH] == c4d.RDATA_FORMATDEPTH_8
     xRes: int = int(data[c4d.RDATA_XRES_VIRTUAL] or data[c4d.RDATA_XRES])
     yRes: int = int(data[c4d.RDATA_YRES_VIRTUAL] or data[c4d.RDATA_YRES])
     if requiresBaking:
@@ -408,14 +440,18 @@ def RenderOcioDocumentToPictureViewer(doc: c4d.documents.BaseDocument) -> None:
     bmp.AddChannel(True, True)
 
     # Carry out the rendering and then bake the result when necessary. We also must null the
-    # profiles, as they are otherwise applied twice.
+    # profiles, as they are otherwise applied twice. Baking is the most expensive step after the
+    # rendering itself, but it cannot be skipped for 8bit output, not even when saving a multilayer
+    # file, as the very same bitmap is also shown in the Picture Viewer, and 8bit data cannot carry
+    # the render space colors without the view transform being baked into it.
     if c4d.documents.RenderDocument(doc, data, bmp, c4d.RENDERFLAGS_EXTERNAL) != c4d.RENDERRESULT_OK:
         raise RuntimeError("Failed to render the temporary document.")
     
     if requiresBaking:
         bmp = c4d.documents.BakeOcioViewToBitmap(bmp, data, c4d.SAVEBIT_NONE) or bmp
-        bmp.SetColorProfile(c4d.bitmaps.ColorProfile(), c4d.COLORPROFILE_INDEX_DISPLAYSPACE)
-        bmp.SetColorProfile(c4d.bitmaps.ColorProfile(), c4d.COLORPROFILE_INDEX_VIEW_TRANSFORM)
+        nullProfile: c4d.bitmaps.ColorProfile = c4d.bitmaps.ColorProfile()
+        bmp.SetColorProfile(nullProfile, c4d.COLORPROFILE_INDEX_DISPLAYSPACE)
+        bmp.SetColorProfile(nullProfile, c4d.COLORPROFILE_INDEX_VIEW_TRANSFORM)
 
     # Display the bitmap in the Picture Viewer, it will look the same as a native rendering, but
     # will not show any OCIO color profiles in the info panel of the Picture Viewer.
@@ -426,17 +462,21 @@ def RenderOcioDocumentToPictureViewer(doc: c4d.documents.BaseDocument) -> None:
     # render data, as that is what #BakeOcioViewToBitmap will read out.
     filePath: str = os.path.join(doc.GetDocumentPath(), "render_ocio.psd")
     flags: int = c4d.SAVEBIT_MULTILAYER
-    if data[c4d.RDATA_FORMATDEPTH] is c4d.RDATA_FORMATDEPTH_16:
+    if data[c4d.RDATA_FORMATDEPTH] == c4d.RDATA_FORMATDEPTH_16:
         flags: int = c4d.SAVEBIT_16BITCHANNELS
-    elif data[c4d.RDATA_FORMATDEPTH] is c4d.RDATA_FORMATDEPTH_32:
+    elif data[c4d.RDATA_FORMATDEPTH] == c4d.RDATA_FORMATDEPTH_32:
         flags: int = c4d.SAVEBIT_32BITCHANNELS
 
     bmp.Save(filePath, c4d.FILTER_PSD, c4d.BaseContainer(), flags)
 
     # Open the file in its native OS app.
-    os.startfile(filePath) if platform.system() == "Windows" else os.system(f"open '{filePath}'")
+    if openFile:
+        os.startfile(filePath) if platform.system() == "Windows" else os.system(f"open '{filePath}'")
     
 if __name__ == "__main__":
+    # The examples are run one after another on the main thread. Running them in parallel threads
+    # would not be safe, as they all access the same document, and showing bitmaps, rendering, and 
+    # updating the UI must happen on the main thread anyway.
     RenderOcioDocumentToPictureViewer(doc)
     CopyColorManagementSettings(doc)
     GetSetColorManagementSettings(doc)
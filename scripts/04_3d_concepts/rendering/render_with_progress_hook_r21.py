@@ -10,8 +10,34 @@ Class/method highlighted:
     - c4d.documents.RenderDocument()
 
 """
+import time
+
 import c4d
 
+# Display names for the render progress types and write modes passed to the callbacks. Looking the
+# name up in a dictionary replaces a chain of if/elif statements, which would be run for each call.
+PROGRESS_TYPE_NAMES = {
+    c4d.RENDERPROGRESSTYPE_BEFORERENDERING: "Before Rendering",
+    c4d.RENDERPROGRESSTYPE_DURINGRENDERING: "During Rendering",
+    c4d.RENDERPROGRESSTYPE_AFTERRENDERING: "After Rendering",
+    c4d.RENDERPROGRESSTYPE_GLOBALILLUMINATION: "GI",
+    c4d.RENDERPROGRESSTYPE_QUICK_PREVIEW: "Quick Preview",
+    c4d.RENDERPROGRESSTYPE_AMBIENTOCCLUSION: "AO",
+}
+
+WRITE_MODE_NAMES = {
+    c4d.WRITEMODE_STANDARD: "Standard",
+    c4d.WRITEMODE_ASSEMBLE_MOVIE: "Assemble Movie",
+    c4d.WRITEMODE_ASSEMBLE_SINGLEIMAGE: "Assemble single image",
+}
+
+# The minimum time in seconds and the minimum progress change between two printed progress messages.
+PROGRESS_PRINT_INTERVAL = 0.05
+PROGRESS_PRINT_DELTA = 0.01
+
+# The time, progress, and progress type of the last printed progress message.
+lastProgressMessage = [0.0, -1.0, None]
+
 
 def PythonCallBack(progress, progress_type):
     """Function passed in RenderDocument. It will be called automatically by Cinema 4D with the current render progress.
@@ -20,25 +46,17 @@ def PythonCallBack(progress, progress_type):
         progress (float): The percent of the progress for the current step
         progress_type (c4d.RENDERPROGRESSTYPE): The Main part of the current rendering step
     """
-    text = str()
-
-    if progress_type == c4d.RENDERPROGRESSTYPE_BEFORERENDERING:
-        text = "Before Rendering"
-
-    elif progress_type == c4d.RENDERPROGRESSTYPE_DURINGRENDERING:
-        text = "During Rendering"
-
-    elif progress_type == c4d.RENDERPROGRESSTYPE_AFTERRENDERING:
-        text = "After Rendering"
-
-    elif progress_type == c4d.RENDERPROGRESSTYPE_GLOBALILLUMINATION:
-        text = "GI"
-
-    elif progress_type == c4d.RENDERPROGRESSTYPE_QUICK_PREVIEW:
-        text = "Quick Preview"
-
-    elif progress_type == c4d.RENDERPROGRESSTYPE_AMBIENTOCCLUSION:
-        text = "AO"
+    # The hook can be called many times per second. Printing to the console is slow in comparison, so
+    # we skip messages which follow the last one too closely in both time and progress. A change of
+    # the progress type and the completion of a step are always printed.
+    now = time.monotonic()
+    lastTime, lastProgress, lastType = lastProgressMessage
+    if (progress_type == lastType and progress < 1.0 and now - lastTime < PROGRESS_PRINT_INTERVAL
+            and abs(progress - lastProgress) < PROGRESS_PRINT_DELTA):
+        return
+    lastProgressMessage[:] = now, progress, progress_type
+
+    text = PROGRESS_TYPE_NAMES.get(progress_type, str())
 
     # Prints to the console the current progress
     print("ProgressHook called [{0} / p: {1}]".format(text, progress * 100.0))
@@ -58,16 +76,7 @@ def PythonWriteCallBack(mode, bmp, fn, mainImage, frame, renderTime, streamnum,
         streamnum (int): The stream number.
         streamname (streamname: str): The stream name.
     """
-    text = str()
-
-    if mode == c4d.WRITEMODE_STANDARD:
-        text = "Standard"
-
-    elif mode == c4d.WRITEMODE_ASSEMBLE_MOVIE:
-        text = "Assemble Movie"
-
-    elif mode == c4d.WRITEMODE_ASSEMBLE_SINGLEIMAGE:
-        text = "Assemble single image"
+    text = WRITE_MODE_NAMES.get(mode, str())
 
     print("ProgressWriteHook called [{0} / p: {1}]".format(text, renderTime))
 
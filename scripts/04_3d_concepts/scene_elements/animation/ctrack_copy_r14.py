@@ -36,12 +36,17 @@ def main():
     if not tracks:
         raise ValueError("Failed to retrieve animated tracks information for obj1.")
 
-    # Defines a list that will contains the ID of parameters we want to copy.
+    # Defines a set that will contains the ID of parameters we want to copy, a set can be tested for
+    # membership without comparing each of its elements.
     # Such ID can be found by drag-and-drop a parameter into the python console.
-    trackListToCopy = [c4d.ID_BASEOBJECT_REL_POSITION, c4d.ID_BASEOBJECT_REL_ROTATION, c4d.ID_BASEOBJECT_REL_SCALE]
+    trackListToCopy = frozenset((c4d.ID_BASEOBJECT_REL_POSITION, c4d.ID_BASEOBJECT_REL_ROTATION,
+                                 c4d.ID_BASEOBJECT_REL_SCALE))
 
-    # Start the Undo process.
+    # Start the Undo process. A single change undo item for obj2 captures the object together with
+    # its tracks, so that removing and inserting tracks below does not require an undo item for each
+    # of the tracks.
     doc.StartUndo()
+    doc.AddUndo(c4d.UNDOTYPE_CHANGE, fixedBox)
 
     # Iterates overs the CTracks of obj1.
     for track in tracks:
@@ -49,14 +54,13 @@ def main():
         did = track.GetDescriptionID()
 
         # If the Parameter ID of the current CTracks is not on the trackListToCopy we go to the next one.
-        if not did[0].id in trackListToCopy:
+        if did[0].id not in trackListToCopy:
             continue
 
         # Find if our static object already got an animation track for this parameter ID.
         foundTrack = fixedBox.FindCTrack(did)
         if foundTrack:
             # Removes the track if found.
-            doc.AddUndo(c4d.UNDOTYPE_DELETEOBJ, foundTrack)
             foundTrack.Remove()
 
         # Copies the initial CTrack in memory. All CCurve and CKey are kept in this CTrack.
@@ -64,7 +68,6 @@ def main():
 
         # Inserts the copied CTrack to the static object.
         fixedBox.InsertTrackSorted(clone)
-        doc.AddUndo(c4d.UNDOTYPE_NEWOBJ, clone)
 
     # Ends the Undo Process.
     doc.EndUndo()
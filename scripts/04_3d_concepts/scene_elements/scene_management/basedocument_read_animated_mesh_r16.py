@@ -5,7 +5,8 @@ Author: Maxime Adam, Ferdinand Hoppe
 Description:
     - Creates a simple animated deformer rig of a sphere with a bend deformer.
     - Animates a BaseDocument from the min to the max preview range.
-    - Creates a Null object for each frame at the position of point 242 of the deformed sphere mesh.
+    - Creates a Null object for each frame at the position of point 242 of the deformed sphere mesh,
+      grouped under a single parent Null.
 
 Class/method highlighted:
     - BaseObject.GetDeformCache()
@@ -13,6 +14,8 @@ Class/method highlighted:
     - BaseDocument.SetTime()
     - BaseDocument.ExecutePasses()
 """
+import math
+
 import c4d
 
 def CreateSetup(doc):
@@ -47,7 +50,7 @@ def CreateSetup(doc):
     if not secondKey:
         raise MemoryError("Could not create the second key for the bend deformer.")
     
-    secondKey["key"].SetValue(curve, 6.283185307179586)  # 2Pi, i.e., 360°
+    secondKey["key"].SetValue(curve, math.tau)  # 2Pi, i.e., 360°
 
     doc.InsertObject(sphere)
     doc.AddUndo(c4d.UNDOTYPE_NEWOBJ, sphere)
@@ -61,10 +64,18 @@ def main():
     ctime = doc.GetTime()
 
     # Retrieve the preview frame range of the document.
-    start = doc.GetLoopMinTime().GetFrame(doc.GetFps())
-    end = doc.GetLoopMaxTime().GetFrame(doc.GetFps())
+    fps = doc.GetFps()
+    start = doc.GetLoopMinTime().GetFrame(fps)
+    end = doc.GetLoopMaxTime().GetFrame(fps)
     frameRange = end - start + 1
 
+    # The build flags for executing the passes do not change over the frames, so we determine
+    # them only once.
+    buildflag = c4d.BUILDFLAGS_NONE if c4d.GetC4DVersion() > 20000 else c4d.BUILDFLAGS_0
+
+    # The positions of the point 242 for each frame, as (frame, position) tuples.
+    samples = []
+
     # Start a stack of undo operations that will be represented as a single undo step.
     doc.StartUndo()
 
@@ -74,11 +85,10 @@ def main():
     # Loops through the preview frame range.
     for frame in range(start, end + 1):
         # Set the document time to the current frame.
-        doc.SetTime(c4d.BaseTime(frame, doc.GetFps()))
+        doc.SetTime(c4d.BaseTime(frame, fps))
 
         # Build the document to calculate animation, dynamics, expressions, etc., i.e., update the
         # scene to the current time (and with that also build the current deform caches).
-        buildflag = c4d.BUILDFLAGS_NONE if c4d.GetC4DVersion() > 20000 else c4d.BUILDFLAGS_0
         doc.ExecutePasses(None, True, True, True, buildflag)
 
         # Get the deform cache of the sphere. Deform caches only exist on point objects who themselves
@@ -97,11 +107,21 @@ def main():
 
         # Calculate the world space position of the point 242 in the deform cache. All points in a
         # point object are always in local space, so we have to multiply it by the global matrix of 
-        # the deform cache to get its world space position.
-        pos = deformCache.GetPoint(242) * deformCache.GetMg()
-
-        # A gradient value we use to color the nulls based on the frame.
-        t = (frame - start) / frameRange
+        # the deform cache to get its world space position. When sampling many points, one should
+        # rather get the global matrix only once and read all points with a single GetAllPoints()
+        # call, instead of calling GetPoint() and GetMg() for each point.
+        samples.append((frame, deformCache.GetPoint(242) * deformCache.GetMg()))
+
+    # Create the null object markers only once all frames have been sampled, so that the frame loop
+    # does nothing but evaluating the scene and reading the point position. The markers are parented
+    # to a single null which is inserted at the end, so that the document and its undo stack are only
+    # modified once instead of once for each marker.
+    markers = c4d.BaseObject(c4d.Onull)
+    markers[c4d.ID_BASELIST_NAME] = "Frame Markers"
+    for i, (frame, pos) in enumerate(samples):
+        # A gradient value we use to color the nulls based on the frame. Since the samples are
+        # ordered by frame, the index of a sample is its offset from the first frame.
+        t = i / frameRange
 
         # Create a null object marker to represent the position of the point at this frame.
         null = c4d.BaseObject(c4d.Onull)
@@ -109,11 +129,13 @@ def main():
         null[c4d.ID_BASEOBJECT_COLOR] = c4d.Vector(1.0, t, t)
         null[c4d.ID_BASELIST_NAME] = f"Frame {frame} - Point 242"
 
-        # Add an undo item for inserting the null.
-        doc.InsertObject(null)
-        doc.AddUndo(c4d.UNDOTYPE_NEWOBJ, null)
+        null.InsertUnderLast(markers)
         null.SetMg(c4d.Matrix(pos))
 
+    # Insert all markers at once and add an undo item for inserting them.
+    doc.InsertObject(markers)
+    doc.AddUndo(c4d.UNDOTYPE_NEWOBJ, markers)
+
     # Set the time back to the original time.
     doc.SetTime(ctime)
 
@@ -121,7 +143,6 @@ def main():
     # executions. This only has to be done for the last frame when executing passes. And is also
     # not really needed here, as we do not do anything with the scene and it does not contain any
     # complex systems like dynamics.
-    buildflag = c4d.BUILDFLAGS_NONE if c4d.GetC4DVersion() > 20000 else c4d.BUILDFLAGS_0
     doc.ExecutePasses(None, True, True, True, buildflag)
 
     # Finalize all our undo operations as a single step.
@@ -44,8 +44,11 @@ def main() -> None:
 
     # Selections in Cinema 4D are a list of states. When we want to create a selection that selects
     # all uneven elements, we have to go `False, True, False, True, ...` until we reach the last
-    # element (because the first element is the element with index 0).
-    states: list[bool] = [i % 2 == 1 for i in range(count)]
+    # element (because the first element is the element with index 0). Instead of testing each
+    # index, we create a list of `False` states and then set every second state to `True` with a
+    # single slice assignment.
+    states: list[bool] = [False] * count
+    states[1::2] = [True] * (count // 2)
     print(f"{states = }")
 
     # Create a new selection, set our states for the clones, and finally write the selection
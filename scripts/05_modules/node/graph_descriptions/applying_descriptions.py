@@ -32,7 +32,10 @@ def main() -> None:
         } 
     }
 
-    # A Standard Renderer and Redshift material graph we are going to use in the example.
+    # A Standard Renderer and Redshift material graph we are going to use in the example. Each
+    # #GetGraph call creates a new material unless an existing one is passed, so such calls must not
+    # be cached. When many descriptions are applied to the same material, one should instead hold
+    # onto the retrieved graph reference and pass it to all #ApplyDescription calls, as done here.
     standardGraph: maxon.NodesGraphModelRef = maxon.GraphDescription.GetGraph(
         name="Standard Material", nodeSpaceId=maxon.NodeSpaceIdentifiers.StandardMaterial)
     redshiftGraph: maxon.NodesGraphModelRef = maxon.GraphDescription.GetGraph(
@@ -70,6 +70,9 @@ def main() -> None:
     # material graphs of a given node space in a document. This can simplify carrying out batch
     # operations on material graphs for a specific render engine, while keeping other render engines
     # untouched. Other than GetGraph, this function will not create new graphs when none exist.
+    # Each call iterates over all materials of the document. When one must visit the graphs of many
+    # node spaces in a scene with many materials, one can instead iterate once over doc.GetMaterials()
+    # and check each NodeMaterial with HasSpace() and GetGraph() for all spaces of interest.
 
      # Print all Redshift renderer material graphs in a document. This will be at least one graph,
      # because created explicitly one in this script.
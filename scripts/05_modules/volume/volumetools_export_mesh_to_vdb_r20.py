@@ -20,7 +20,10 @@ import maxon
 import os
 
 
-def polygonToVolume(obj):
+def polygonToVolume(obj, vertices=None, polygons=None):
+    # The optional vertices and polygons arrays are scratch arrays which are resized and overwritten,
+    # so that a caller converting many objects can pass the same arrays for all of them.
+
     # Checks if the input obj is a PolygonObject
     if not obj.IsInstanceOf(c4d.Opolygon):
         raise TypeError("obj is not a c4d.Opolygon.")
@@ -29,13 +32,15 @@ def polygonToVolume(obj):
     matrix = obj.GetMg()
 
     # Creates a BaseArray (list) of all points position in world space
-    vertices = maxon.BaseArray(maxon.Vector)
+    if vertices is None:
+        vertices = maxon.BaseArray(maxon.Vector)
     vertices.Resize(obj.GetPointCount())
     for i, pt in enumerate(obj.GetAllPoints()):
         vertices[i] = pt * matrix
 
     # Sets polygons
-    polygons = maxon.BaseArray(maxon.VolumeConversionPolygon)
+    if polygons is None:
+        polygons = maxon.BaseArray(maxon.VolumeConversionPolygon)
     polygons.Resize(obj.GetPolygonCount())
     for i, poly in enumerate(obj.GetAllPolygons()):
         newPoly = maxon.VolumeConversionPolygon()
@@ -50,31 +55,28 @@ def polygonToVolume(obj):
 
         polygons[i] = newPoly
 
+    # Sets the matrice used for local grid translation and rotation, i.e., it places the voxel grid
+    # and does not transform the world space vertices once more. It copies the world matrix retrieved
+    # above, instead of retrieving it again for each component
     polygonObjectMatrix = maxon.Matrix()
-    polygonObjectMatrix.off = obj.GetMg().off
-    polygonObjectMatrix.v1 = obj.GetMg().v1
-    polygonObjectMatrix.v2 = obj.GetMg().v2
-    polygonObjectMatrix.v3 = obj.GetMg().v3
+    polygonObjectMatrix.off = matrix.off
+    polygonObjectMatrix.v1 = matrix.v1
+    polygonObjectMatrix.v2 = matrix.v2
+    polygonObjectMatrix.v3 = matrix.v3
     gridSize = 10
     bandWidthInterior = 1
     bandWidthExterior = 1
     thread = maxon.ThreadRef()
 
-    # Before R21
-    if c4d.GetC4DVersion() < 21000:
-        volumeRef = maxon.VolumeToolsInterface.MeshToVolume(vertices,
-                                                            polygons, polygonObjectMatrix,
-                                                            gridSize,
-                                                            bandWidthInterior, bandWidthExterior,
-                                                            thread, None)
-    else:
-        volumeRef = maxon.VolumeToolsInterface.MeshToVolume(vertices,
-                                                            polygons, polygonObjectMatrix,
-                                                            gridSize,
-                                                            bandWidthInterior, bandWidthExterior,
-                                                            thread,
-                                                            maxon.POLYGONCONVERSIONFLAGS.NONE, None)
-    
+    # The arguments are the same for all versions, only since R21 the conversion flags are expected
+    # before the last argument, so we only branch for them.
+    arguments = [vertices, polygons, polygonObjectMatrix, gridSize,
+                 bandWidthInterior, bandWidthExterior, thread]
+    if c4d.GetC4DVersion() >= 21000:
+        arguments.append(maxon.POLYGONCONVERSIONFLAGS.NONE)
+
+    volumeRef = maxon.VolumeToolsInterface.MeshToVolume(*arguments, None)
+
     return volumeRef
 
 
@@ -98,8 +100,13 @@ def main():
     # Creates a maxon.BaseArray with all our obj, we want to convert
     volumesArray = maxon.BaseArray(maxon.VolumeRef)
     volumesArray.Resize(len(objList))
+
+    # The vertices and polygons arrays are only needed during each conversion, so we allocate them
+    # once and reuse them for all objects
+    vertices = maxon.BaseArray(maxon.Vector)
+    polygons = maxon.BaseArray(maxon.VolumeConversionPolygon)
     for i, obj in enumerate(objList):
-        volumesArray[i] = polygonToVolume(obj)
+        volumesArray[i] = polygonToVolume(obj, vertices, polygons)
 
     # Generates the final file path to save the vdb
     path = maxon.Url(filePath)